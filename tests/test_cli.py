@@ -0,0 +1,71 @@
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+from timetable_exporter import argparse_utils, cli
+from timetable_exporter.argparse_utils import LoadExcelAction
+from timetable_exporter.cli import _safe_sheet_title
+
+
+def test_safe_sheet_title_sanitizes_and_deduplicates():
+    used: dict[str, int] = {}
+    titles = [_safe_sheet_title(name, used) for name in ["A/B", "A/B", "A_B", "", "x" * 40, "x" * 40]]
+
+    assert titles == ["A_B", "A_B_2", "A_B_3", "Sheet", "x" * 31, "x" * 29 + "_2"]
+    assert _safe_sheet_title("A_B_2", used) == "A_B_2_2"
+
+
+def test_load_excel_falls_back_when_calamine_engine_is_unknown(monkeypatch):
+    engines = []
+
+    def read_excel(path, engine):
+        engines.append(engine)
+        if engine == "calamine":
+            # What pandas before 2.2 raises for the engine
+            raise ValueError("Unknown engine: calamine")
+        return pd.DataFrame({"a": [1]})
+
+    monkeypatch.setattr(argparse_utils.pd, "read_excel", read_excel)
+    namespace = argparse.Namespace()
+    LoadExcelAction(option_strings=[], dest="excel_file")(argparse.ArgumentParser(), namespace, "in.xlsx")
+
+    assert engines == ["calamine", "openpyxl"]
+    assert namespace.excel_file["a"].tolist() == [1]
+
+
+def test_calendars_are_written_by_a_process_pool(tmp_path, monkeypatch):
+    pd.DataFrame(
+        {
+            "summary": ["AMME2500/Lecture", "MTRX2700/Lab", "AMME2500/Tut"],
+            "dtstart": pd.to_datetime(["2025-03-03 09:00", "2025-03-04 10:00", "2025-03-05 11:00"]),
+            "duration": [1, 2, 1],
+            "location": ["ROOM.A", "ROOM.B", "ROOM.A"],
+        }
+    ).to_excel(tmp_path / "in.xlsx", index=False)
+    mapping = {"columns": {"summary": "summary", "dtstart": "dtstart", "duration": "duration", "location": "location"}}
+    filters = {"calendars": [{"filename": "amme", "filter": {"summary": "AMME2500"}}, {"filename": "mtrx", "filter": {"summary": "MTRX2700"}}]}
+    (tmp_path / "a.mapping.json").write_text(json.dumps(mapping))
+    (tmp_path / "f.filters.json").write_text(json.dumps(filters))
+    out = tmp_path / "out"
+    out.mkdir()
+
+    pools = []
+
+    class RecordingPool(cli.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    monkeypatch.setattr(cli, "_available_cpus", lambda: 2)
+    monkeypatch.setattr(cli, "ProcessPoolExecutor", RecordingPool)
+    monkeypatch.setattr(sys, "argv", ["timetable_exporter", str(tmp_path / "in.xlsx"), "--mapping", str(tmp_path / "a.mapping.json"),
+                                      "--filters", str(tmp_path / "f.filters.json"), "--output_dir", str(out)])
+    cli.timetable_exporter()
+
+    assert len(pools) == 1
+    amme = (out / "amme.ics").read_text()
+    mtrx = (out / "mtrx.ics").read_text()
+    assert amme.count("BEGIN:VEVENT") == 2 and "AMME2500/Tut" in amme
+    assert mtrx.count("BEGIN:VEVENT") == 1 and "MTRX2700/Lab" in mtrx
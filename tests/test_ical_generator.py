@@ -0,0 +1,52 @@
+import io
+
+import pandas as pd
+from icalendar import Calendar
+
+from timetable_exporter.ical_generator import IcalGenerator
+
+
+def test_generate_ical_from_dataframe():
+    df = pd.DataFrame(
+        {
+            "summary": ["TEST1000 Lecture", "TEST1000 Lab"],
+            "location": ["ROOM.A", None],
+            "dtstart": ["2025-04-01 09:00:00", "2025-04-02 14:30:00"],
+            "duration": [1.5, 2],
+        }
+    )
+    columns = {"summary": "summary", "location": "location", "dtstart": "dtstart", "duration": "duration"}
+
+    cal = IcalGenerator(columns, timezone="Australia/Sydney").generate_ical(df, "test")
+    events = cal.walk("VEVENT")
+
+    assert len(events) == 2
+    assert len({str(e["UID"]) for e in events}) == 2
+    assert str(events[0]["SUMMARY"]) == "TEST1000 Lecture"
+
+    text = cal.to_ical().decode()
+    assert "DTSTART;TZID=Australia/Sydney:20250401T090000" in text
+    assert "DURATION:PT1H30M" in text
+    assert "DURATION:PT2H" in text
+
+
+def test_write_ical_streams_full_calendar():
+    df = pd.DataFrame(
+        {
+            "summary": ["A", "B", "C"],
+            "location": ["ROOM.A", "ROOM.B", "ROOM.C"],
+            "dtstart": pd.to_datetime(["2025-04-01 09:00", "2025-04-02 10:00", "2025-04-03 11:00"]),
+            "dtend": pd.to_datetime(["2025-04-01 10:00", "2025-04-02 11:00", "2025-04-03 12:00"]),
+        }
+    )
+    columns = {"summary": "summary", "location": "location", "dtstart": "dtstart", "dtend": "dtend"}
+
+    buffer = io.BytesIO()
+    IcalGenerator(columns).write_ical(df, buffer, "test")
+    data = buffer.getvalue()
+
+    assert data.startswith(b"BEGIN:VCALENDAR\r\n")
+    assert data.endswith(b"END:VCALENDAR\r\n")
+    cal = Calendar.from_ical(data)
+    assert str(cal["PRODID"]) == "-//test//timetable-exporter//EN"
+    assert [str(e["SUMMARY"]) for e in cal.walk("VEVENT")] == ["A", "B", "C"]
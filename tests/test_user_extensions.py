@@ -1,6 +1,9 @@
+import datetime
 import pandas as pd
+import pytest
 from timetable_exporter import user_extensions
-from timetable_exporter.user_extensions.datetime import combine_date_time, extrapolate_date_ranges
+from timetable_exporter.user_extensions import datetime as dt_ext
+from timetable_exporter.user_extensions.datetime import _DT_CACHE, combine_date_time, extrapolate_date_ranges
 def test_combine_date_time():
     # Create a sample DataFrame
     data = {
@@ -24,6 +27,79 @@ def test_combine_date_time():
 
     print("Test passed: combine_date_time works as expected.")
 
+def test_combine_date_time_typed_columns():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2025-04-01 00:00", "2025-04-02 08:00"]),
+        "time": [datetime.time(12, 0), datetime.time(14, 30)],
+    })
+    combined = df.timetable.combine_date_time("date", "time", "datetime")
+
+    expected = pd.to_datetime(["2025-04-01 12:00:00", "2025-04-02 14:30:00"])
+    assert combined["datetime"].tolist() == expected.tolist()
+def test_combine_date_time_with_non_string_label():
+    df = pd.DataFrame({"date": ["2025-04-01"], "time": ["12:00:00"]})
+    combined = df.timetable.combine_date_time("date", "time", 2025)
+
+    assert combined.columns.tolist() == [2025]
+    assert combined[2025].tolist() == [pd.Timestamp("2025-04-01 12:00")]
+    assert df.columns.tolist() == ["date", "time"]
+
+
+def test_combine_date_time_rejects_non_clock_times():
+    # Integer HHMM values and out-of-range times are not offsets from midnight
+    for bad in (930, "930", "25:00:00", "1 day", "-01:00:00"):
+        df = pd.DataFrame({
+            "date": pd.to_datetime(["2025-04-01", "2025-04-02"]),
+            "time": pd.Series(["09:00:00", bad], dtype=object),
+        })
+        combined = df.timetable.combine_date_time("date", "time", "datetime", drop_invalid=True)
+        assert combined["datetime"].tolist() == [pd.Timestamp("2025-04-01 09:00")], bad
+
+    df = pd.DataFrame({"date": pd.to_datetime(["2025-04-01"]), "time": [930]})
+    with pytest.raises(ValueError):
+        df.timetable.combine_date_time("date", "time", "datetime")
+
+def test_combine_date_time_time_objects_with_missing():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2025-04-01", "2025-04-02", "2025-04-03"]),
+        "time": [datetime.time(9, 30), None, datetime.time(9, 30, 15)],
+    })
+    combined = df.timetable.combine_date_time("date", "time", "datetime", drop_invalid=True)
+
+    assert combined["datetime"].tolist() == [pd.Timestamp("2025-04-01 09:30"), pd.Timestamp("2025-04-03 09:30:15")]
+
+def test_combine_date_time_mixed_formats_keep_one_format():
+    df = pd.DataFrame({"date": ["2025-04-01", "02/04/2025"], "time": ["09:00", "14:30"]})
+    combined = df.timetable.combine_date_time("date", "time", "datetime", drop_invalid=True)
+
+    assert combined.index.tolist() == [0]
+    assert combined["datetime"].tolist() == [pd.Timestamp("2025-04-01 09:00")]
+
+def test_combine_date_time_cache_hit(monkeypatch):
+    _DT_CACHE.clear()
+    df = pd.DataFrame({"date": ["2025-04-01", "2025-04-02"], "time": ["12:00:00", "14:30:00"]})
+    first = df.timetable.combine_date_time("date", "time", "datetime", cache=True)
+    assert len(_DT_CACHE) == 1
+
+    # Same contents under another index: served from the cache and realigned
+    def fail(*args, **kwargs):
+        raise AssertionError("expected a cache hit")
+    monkeypatch.setattr(dt_ext, "_combine", fail)
+    shifted = df.set_axis([10, 20])
+    hit = shifted.timetable.combine_date_time("date", "time", "datetime", cache=True)
+    assert hit.index.tolist() == [10, 20]
+    assert hit["datetime"].tolist() == first["datetime"].tolist()
+
+    # The timezone is part of the key
+    monkeypatch.undo()
+    utc = shifted.timetable.combine_date_time("date", "time", "datetime", tz="UTC", cache=True)
+    assert len(_DT_CACHE) == 2
+    assert str(utc["datetime"].dt.tz) == "UTC"
+
+    # Without cache=True nothing is stored
+    df.timetable.combine_date_time("date", "time", "datetime", tz="Australia/Sydney")
+    assert len(_DT_CACHE) == 2
+
 def test_extrapolate_date_ranges():
     date_range_str = "6/3-17/4, 1/5-29/5"
     expected_dates_str = [
@@ -77,6 +153,56 @@ def test_expand_dates():
     print("Test passed: expand_dates works as expected.")
 
 
+def test_expand_dates_with_non_string_label():
+    df = pd.DataFrame({2025: ["6/3-13/3", "5/5"], "other_col": [1, 2]})
+
+    expanded_df = df.timetable.expand_dates(2025, year=2025, format="%d/%m")
+    assert expanded_df[2025].tolist() == [pd.Timestamp("2025-03-06"), pd.Timestamp("2025-03-13"), pd.Timestamp("2025-05-05")]
+    assert expanded_df["other_col"].tolist() == [1, 1, 2]
+
+def test_expand_dates_rows_without_dates_keep_one_nat_row():
+    df = pd.DataFrame({"dates": ["5/5", None, "", "6/5"], "other_col": [1, 2, 3, 4]})
+
+    expanded_df = df.timetable.expand_dates("dates", year=2025, format="%d/%m")
+    assert expanded_df["other_col"].tolist() == [1, 2, 3, 4]
+    assert expanded_df["dates"].isna().tolist() == [False, True, True, False]
+
+
+def test_expand_dates_year_across_leap_day():
+    # 2023 has no Feb 29; moved into 2024 the same weekly range gains one
+    df = pd.DataFrame({"dates": ["22/2/2023-7/3/2023"]})
+
+    expanded_df = df.timetable.expand_dates("dates", year=2024)
+    assert expanded_df["dates"].tolist() == [pd.Timestamp("2024-02-22"), pd.Timestamp("2024-02-29"), pd.Timestamp("2024-03-07")]
+
+    expanded_df = df.timetable.expand_dates("dates", year=2025)
+    assert expanded_df["dates"].tolist() == [pd.Timestamp("2025-02-22"), pd.Timestamp("2025-03-01")]
+
+
+def test_expand_dates_leap_day_into_common_year_raises():
+    df = pd.DataFrame({"dates": ["29/2/2024"]})
+
+    assert df.timetable.expand_dates("dates", year=2028)["dates"].tolist() == [pd.Timestamp("2028-02-29")]
+    with pytest.raises(ValueError):
+        df.timetable.expand_dates("dates", year=2025)
+    with pytest.raises(ValueError):
+        extrapolate_date_ranges("29/2/2024", year=2025)
+
+
+def test_expand_dates_frequencies_match_extrapolate_date_ranges():
+    # "14D" is a fixed step (periods= path); "MS" is a calendar offset (end= path)
+    date_ranges = "6/3-17/4, 15/1-15/4, 3/3-9/3"
+    df = pd.DataFrame({"dates": [date_ranges]})
+
+    for frequency in ("14D", "MS"):
+        expanded_df = df.timetable.expand_dates("dates", year=2025, format="%d/%m", frequency=frequency)
+        expected = extrapolate_date_ranges(date_ranges, year=2025, format="%d/%m", frequency=frequency)
+        assert expanded_df["dates"].tolist() == expected, frequency
+
+    assert expected == [pd.Timestamp("2025-04-01"), pd.Timestamp("2025-02-01"), pd.Timestamp("2025-03-01"), pd.Timestamp("2025-04-01")]
+    fortnightly = df.timetable.expand_dates("dates", year=2025, format="%d/%m", frequency="14D")["dates"]
+    assert fortnightly.dt.strftime("%d/%m").tolist() == ["06/03", "20/03", "03/04", "17/04", "15/01", "29/01", "12/02", "26/02", "12/03", "26/03", "09/04", "03/03"]
+
 def test_exclude_filters_contains():
     df = pd.DataFrame(
         {
@@ -91,3 +217,70 @@ def test_exclude_filters_contains():
     out = df.timetable.exclude({"summary": "IGN"}, exact_match=False)
     assert len(out) == 2
     assert out["summary"].str.contains("IGN").sum() == 0
+
+
+def test_filter_list_values_match_literally():
+    df = pd.DataFrame({"summary": ["ELEC1103/Lab (A)/04", "ELEC1103/Lab A/05", "C++ Workshop", "C Workshop"]})
+
+    out = df.timetable.filter({"summary": ["lab (a)"]}, exact_match=False)
+    assert out.index.tolist() == [0]
+
+    out = df.timetable.filter({"summary": ["C++"]}, exact_match=False)
+    assert out.index.tolist() == [2]
+
+
+def test_exclude_list_values_match_literally():
+    df = pd.DataFrame({"summary": ["ELEC1103/Lab (A)/04", "ELEC1103/Lab A/05", "C++ Workshop", "C Workshop"]})
+
+    out = df.timetable.exclude({"summary": ["Lab (A)", "c++"]}, exact_match=False)
+    assert out.index.tolist() == [1, 3]
+
+
+def test_filter_many_matches_filter():
+    df = pd.DataFrame(
+        {
+            "summary": ["AMME2500-S1C/Lecture", "MTRX2700-S1C/Lab", None, "amme2500-S1C/Tut"],
+            "location": ["ROOM.A", "ROOM.B", "ROOM.A", None],
+        }
+    )
+    filters_list = [
+        {"summary": "AMME2500"},
+        {"summary": ["mtrx", "tut"], "location": "room"},
+        {"location": ["ROOM.A"]},
+        {},
+    ]
+
+    for exact_match in (False, True):
+        many = df.timetable.filter_many(filters_list, exact_match=exact_match)
+        for filters, out in zip(filters_list, many):
+            pd.testing.assert_frame_equal(out, df.timetable.filter(filters, exact_match=exact_match))
+
+    # 1, 1.0 and True are hash-equal but read differently as text
+    mixed = pd.DataFrame({"o3": pd.Series([1, "1", 1.0, True, "x"], dtype=object)})
+    mixed_filters = [{"o3": "1"}, {"o3": ["true"]}, {"o3": True}]
+    for exact_match in (False, True):
+        many = mixed.timetable.filter_many(mixed_filters, exact_match=exact_match)
+        for filters, out in zip(mixed_filters, many):
+            pd.testing.assert_frame_equal(out, mixed.timetable.filter(filters, exact_match=exact_match))
+    assert mixed.timetable.filter_many([{"o3": "1"}])[0].index.tolist() == [0, 1, 2]
+
+
+def test_call_internal_method_with_non_string_label():
+    df = pd.DataFrame({2025: [" Lab ", "Tut "], "other_col": [1, 2]})
+
+    out = df.timetable.call_internal_method("strip", 2025)
+    assert out[2025].tolist() == ["Lab", "Tut"]
+    assert out.columns.tolist() == [2025, "other_col"]
+    assert df[2025].tolist() == [" Lab ", "Tut "]
+
+
+def test_only_marked_functions_are_registered():
+    from timetable_exporter.user_extensions.timetable_accessor import TimetableAccessor
+
+    for name in ("combine_date_time", "expand_dates", "filter"):
+        assert name in TimetableAccessor._registry
+    for name in ("append_year", "extrapolate_date_ranges"):
+        assert name not in TimetableAccessor._registry
+        assert not hasattr(TimetableAccessor, name)
+    # Returns a list of frames, so a mapping pipeline must not be able to call it
+    assert "filter_many" not in TimetableAccessor._registry
@@ -0,0 +1,65 @@
+import pandas as pd
+from openpyxl import Workbook
+
+from timetable_exporter.week_view_exporter import build_week_view_workbook, render_week_view_worksheet
+
+
+def test_week_view_aggregates_bookings():
+    df = pd.DataFrame(
+        [
+            {"Day": "Monday", "Start": "09:00", "Duration": "02:00:00", "Summary": "TEST1000/Lab", "Week": "S1C WK 3,5", "Description": "Group 2"},
+            {"Day": " Monday ", "Start": "09:00", "Duration": "02:00:00", "Summary": "TEST1000/Lab", "Week": "S1C WK 1", "Description": "Group 2"},
+            {"Day": "Tuesday", "Start": "10:00", "Duration": "01:00:00", "Summary": "TEST2000/Tut", "Week": "S1C FULL", "Description": None},
+            {"Day": "Saturday", "Start": "10:00", "Duration": "01:00:00", "Summary": "TEST3000/Tut", "Week": "S1C WK 1", "Description": None},
+            {"Day": "Monday", "Start": None, "Duration": "01:00:00", "Summary": "TEST4000/Tut", "Week": "S1C WK 1", "Description": None},
+        ]
+    )
+
+    cfg = {
+        "summary_transform": {"split_on": "/", "take": 0},
+        "summary_annotation": {"column": "Description", "regex": r"Group (\d+)"},
+        "summary_format": "{summary} G{annotation}",
+        "week_pattern_prefix": "S1C",
+        "week_pattern_full_term_tokens": ["S1C FULL"],
+        "week_pattern_full_term_label": "WK 1-13",
+        "columns": {
+            "day": "Day",
+            "start_time": "Start",
+            "duration": "Duration",
+            "summary": "Summary",
+            "week_pattern": "Week",
+        },
+        "layout": {
+            "days": ["Monday", "Tuesday"],
+            "start_time": "08:00",
+            "end_time": "12:00",
+            "interval_minutes": 60,
+        },
+        "formatting": {"palette": ["FFF2CC"]},
+    }
+
+    ws = build_week_view_workbook(df, cfg).active
+
+    assert ws["B3"].value == "TEST1000 G2\n(WK 1, 3,5)"
+    assert "B3:B4" in {str(r) for r in ws.merged_cells.ranges}
+    assert ws["B3"].fill.start_color.rgb == "00FFF2CC"
+    assert ws["C4"].value == "TEST2000\n(WK 1-13)"
+    assert [ws.cell(row=r, column=c).value for r in (1, 5) for c in (2, 3)] == ["Monday", "Tuesday", None, None]
+
+
+def test_week_view_labels_stay_on_the_grid_in_a_used_sheet():
+    ws = Workbook().active
+    ws.cell(row=20, column=1, value="existing")
+    df = pd.DataFrame([{"Day": "Monday", "Start": "09:00", "End": "10:00", "Summary": "TEST1000"}])
+    cfg = {
+        "columns": {"day": "Day", "start_time": "Start", "end_time": "End", "summary": "Summary"},
+        "layout": {"days": ["Monday"], "start_time": "08:00", "end_time": "10:00", "interval_minutes": 60},
+    }
+
+    render_week_view_worksheet(ws, df, cfg)
+
+    assert [ws.cell(row=r, column=1).value for r in (2, 3)] == ["08:00", "09:00"]
+    assert ws["A2"].font.bold
+    assert ws["B1"].value == "Monday"
+    assert ws["B3"].value == "TEST1000"
+    assert ws["A20"].value == "existing"
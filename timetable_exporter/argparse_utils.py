@@ -2,14 +2,31 @@ import argparse
 import json
 import os
 import pandas as pd
+
+try:
+    import orjson  # optional, much faster JSON parser
+except ImportError:
+    orjson = None
+
+
+def load_json_file(path: str):
+    """Load a JSON file, using orjson when it is installed.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers only need to catch the latter.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 class LoadJSONAction(argparse.Action):
     def __call__(self, parser, namespace, values, option_string=None):
         try:
             if values is None:
                 setattr(namespace, self.dest, None)
                 return
-            with open(values, 'r') as f:
-                setattr(namespace, self.dest, json.load(f))
+            setattr(namespace, self.dest, load_json_file(values))
         except FileNotFoundError:
             parser.error(f"File not found: {values}")
         except json.JSONDecodeError as e:
@@ -31,7 +48,12 @@ class LoadExcelAction(argparse.Action):
             if lower.endswith('.xls'):
                 df = pd.read_excel(path, engine='xlrd')
             else:
-                df = pd.read_excel(path, engine='openpyxl')
+                # python-calamine (optional) is much faster than openpyxl for large sheets;
+                # pandas before 2.2 does not know the engine and raises ValueError
+                try:
+                    df = pd.read_excel(path, engine='calamine')
+                except (ImportError, ValueError):
+                    df = pd.read_excel(path, engine='openpyxl')
             setattr(namespace, self.dest, df)
         except FileNotFoundError:
             parser.error(f"File not found: {values}")
@@ -1,12 +1,13 @@
 import argparse
 import sys
 import os
-import json
 import traceback
-import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
 from .ical_generator import IcalGenerator
 from .user_extensions import TimetableAccessor
-from .argparse_utils import LoadExcelAction, LoadJSONAction, ValidateDirectoryAction  # Import custom actions
+from .argparse_utils import LoadExcelAction, LoadJSONAction, ValidateDirectoryAction, load_json_file  # Import custom actions
 from openpyxl import Workbook
 
 from .week_view_exporter import build_week_view_workbook, render_week_view_worksheet
@@ -17,93 +18,107 @@ def _root_data_path(*parts: str) -> str:
     return os.path.join(base, *parts)
 
 
+def _available_cpus() -> int:
+    """CPUs this process may run on, honouring affinity masks and cpusets where the OS exposes them."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
 def _default_mapping_path() -> str:
     return _root_data_path("presets", "mapping.template.json")
 
 
-def _preset_roots() -> list[str]:
+@lru_cache(maxsize=None)
+def _preset_roots() -> tuple[str, ...]:
     """Search paths for presets.
 
     - data/presets: shipped, public templates
     - data/proprietary/presets: optional local-only presets (gitignored)
     """
     roots = [_root_data_path("presets"), _root_data_path("proprietary", "presets")]
-    return [p for p in roots if os.path.isdir(p)]
+    return tuple(p for p in roots if os.path.isdir(p))
 
 
-def _walk_preset_files(base: str):
-    """Yield (root, filename) for preset files, skipping public 'proprietary' subtrees."""
-    for root, dirs, files in os.walk(base):
+@lru_cache(maxsize=None)
+def _preset_files(base: str) -> tuple[str, ...]:
+    """Relative paths of preset files under base, skipping public 'proprietary' subtrees."""
+    root = Path(base)
+    files = []
+    for path in root.rglob("*.json"):
+        rel = path.relative_to(root)
         # Never ship or expose presets from a public 'proprietary' subtree.
-        if os.path.basename(base) == "presets":
-            dirs[:] = [d for d in dirs if d.lower() != "proprietary"]
-        for name in files:
-            yield root, name
+        if root.name == "presets" and any(part.lower() == "proprietary" for part in rel.parts[:-1]):
+            continue
+        files.append(rel.as_posix())
+    return tuple(sorted(files))
 
 
-def _load_preset_json(filename: str) -> dict:
+@lru_cache(maxsize=None)
+def _find_preset(filename: str) -> str:
     bases = _preset_roots()
 
     # Allow subfolder-qualified names like "team/foo.mapping.json" relative to any preset root
     for base in bases:
         candidate = os.path.join(base, filename)
         if os.path.isfile(candidate):
-            with open(candidate, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return candidate
 
-    matches: list[tuple[str, str]] = []  # (base, abs_path)
+    matches: list[tuple[str, str]] = []  # (base, relative path)
     for base in bases:
-        for root, name in _walk_preset_files(base):
-            if name == filename:
-                matches.append((base, os.path.join(root, name)))
+        for rel in _preset_files(base):
+            if rel.rsplit("/", 1)[-1] == filename:
+                matches.append((base, rel))
 
     if len(matches) == 1:
-        with open(matches[0][1], "r", encoding="utf-8") as f:
-            return json.load(f)
+        base, rel = matches[0]
+        return os.path.join(base, rel)
     if len(matches) > 1:
-        rels = [os.path.relpath(p, base).replace("\\", "/") for base, p in matches]
+        rels = [rel for _, rel in matches]
         raise ValueError(f"Preset name is ambiguous: {filename}. Matches: {rels}")
 
     raise FileNotFoundError(f"Preset not found: {filename}")
 
 
-def _list_presets() -> tuple[list[str], list[str]]:
+def _load_preset_json(filename: str) -> dict:
+    # Only the lookup is cached; every caller gets its own freshly loaded dict
+    return load_json_file(_find_preset(filename))
+
+
+@lru_cache(maxsize=None)
+def _list_presets() -> tuple[tuple[str, ...], tuple[str, ...]]:
     mappings: list[str] = []
     filters: list[str] = []
     for base in _preset_roots():
-        for root, name in _walk_preset_files(base):
-            rel = os.path.relpath(os.path.join(root, name), base)
-            rel = rel.replace("\\", "/")
-            if name.endswith(".mapping.json"):
+        for rel in _preset_files(base):
+            if rel.endswith(".mapping.json"):
                 mappings.append(rel[:-len(".mapping.json")])
-            elif name.endswith(".filters.json"):
+            elif rel.endswith(".filters.json"):
                 filters.append(rel[:-len(".filters.json")])
-    return sorted(mappings), sorted(filters)
+    return tuple(sorted(mappings)), tuple(sorted(filters))
 
 
-_INVALID_SHEET_CHARS = re.compile(r"[\\/*?:\[\]]")
+_SHEET_TITLE_TRANS = str.maketrans({c: "_" for c in "\\/*?:[]"})
 
 
-def _safe_sheet_title(title: str, used: set[str]) -> str:
+def _safe_sheet_title(title: str, used: dict[str, int]) -> str:
     # Excel: max 31 chars, cannot contain: \ / * ? : [ ]
-    base = _INVALID_SHEET_CHARS.sub("_", (title or "").strip())
+    # `used` maps each title handed out so far to the next suffix to try for it.
+    base = (title or "").strip().translate(_SHEET_TITLE_TRANS)
     base = base[:31] if base else "Sheet"
 
     candidate = base
-    i = 2
+    i = used.get(base, 2)
     while candidate in used:
         suffix = f"_{i}"
         candidate = (base[: max(0, 31 - len(suffix))] + suffix) or f"Sheet{i}"
         i += 1
-    used.add(candidate)
+    if candidate != base:
+        used[base] = i
+    used.setdefault(candidate, 2)
     return candidate
 
 
-def _load_json_file(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
 def _resolve_week_view_template(value: str | dict | None) -> dict | None:
     """Resolve week view template from either a path or a preset name.
 
@@ -124,7 +139,7 @@ def _resolve_week_view_template(value: str | dict | None) -> dict | None:
 
     # Path on disk
     if os.path.isfile(text):
-        return _load_json_file(text)
+        return load_json_file(text)
 
     # Preset name/filename
     candidates = [text]
@@ -164,6 +179,13 @@ def _save_workbook_with_fallback(wb: Workbook, output_path: str) -> str:
         raise
 
 
+def _write_calendar(ical_generator: IcalGenerator, df, company: str, output_file: str) -> str:
+    """Write one .ics file. Module-level so it can run in a worker process."""
+    with open(output_file, 'wb', buffering=1 << 20) as f:
+        ical_generator.write_ical(df, f, company)
+    return output_file
+
+
 def setup_argparse():
     parser = argparse.ArgumentParser(description='Generate an iCal file from a timetabling Excel sheet.')
     parser.add_argument('excel_file', nargs='?', type=str, help='The path of the local Excel file.')
@@ -266,8 +288,11 @@ def timetable_exporter():
         for func, parameters in user_extensions.items():
             if func in skip_extensions:
                 continue
+            method = TimetableAccessor._registry.get(func)
+            if method is None:
+                raise ValueError(f"Unknown user extension: {func}. Available: {sorted(TimetableAccessor._registry)}")
             for call in parameters:
-                df = getattr(df.timetable, func)(*call.get("args", []), **(call.get("kwargs") or {}))
+                df = method(df.timetable, *call.get("args", []), **(call.get("kwargs") or {}))
 
         # Load the configuration file
         columns = args.mapping["columns"]
@@ -278,29 +303,29 @@ def timetable_exporter():
         # Initialize the iCal generator
         ical_generator = IcalGenerator(columns, timezone=args.timezone)
 
+        # Filter the data for every calendar up front; shared by the weekly view and the iCal output
+        calendars = filters_payload.get("calendars") or []
+        calendar_dfs = df.timetable.filter_many([c["filter"] for c in calendars], exact_match=args.exact)
+
         # Optional weekly view export
         if args.week_view or args.week_view_output:
             week_view_cfg = _resolve_week_view_template(args.week_view_template)
             if week_view_cfg is None:
                 week_view_cfg = _load_preset_json("week_view.template.json")
 
-            calendars = filters_payload.get("calendars") or []
             output_path = args.week_view_output
             if output_path is None:
                 output_path = os.path.join(args.output_dir, "week_view.xlsx")
 
             if calendars:
                 if args.week_view_calendar:
-                    selected = next((c for c in calendars if c.get("filename") == args.week_view_calendar), None)
+                    selected = next((i for i, c in enumerate(calendars) if c.get("filename") == args.week_view_calendar), None)
                     if selected is None:
                         raise ValueError(f"Calendar not found for weekly view: {args.week_view_calendar}")
-                    week_view_df = df.timetable.filter(selected["filter"], exact_match=args.exact)
-                    wb = build_week_view_workbook(week_view_df, week_view_cfg)
+                    wb = build_week_view_workbook(calendar_dfs[selected], week_view_cfg)
                     _save_workbook_with_fallback(wb, output_path)
                 elif len(calendars) == 1:
-                    selected = calendars[0]
-                    week_view_df = df.timetable.filter(selected["filter"], exact_match=args.exact)
-                    wb = build_week_view_workbook(week_view_df, week_view_cfg)
+                    wb = build_week_view_workbook(calendar_dfs[0], week_view_cfg)
                     _save_workbook_with_fallback(wb, output_path)
                 else:
                     # Multiple calendars:
@@ -310,17 +335,15 @@ def timetable_exporter():
                         wb = Workbook()
                         # Remove default sheet
                         wb.remove(wb.active)
-                        used_titles: set[str] = set()
-                        for calendar in calendars:
-                            week_view_df = df.timetable.filter(calendar["filter"], exact_match=args.exact)
+                        used_titles: dict[str, int] = {}
+                        for calendar, week_view_df in zip(calendars, calendar_dfs):
                             sheet_name = _safe_sheet_title(calendar.get("filename") or "Calendar", used_titles)
                             ws = wb.create_sheet(title=sheet_name)
                             render_week_view_worksheet(ws, week_view_df, week_view_cfg)
                         _save_workbook_with_fallback(wb, output_path)
                     else:
                         ValidateDirectoryAction(option_strings=['--week-view-output'], dest='week_view_output')(parser, args, output_path)
-                        for calendar in calendars:
-                            week_view_df = df.timetable.filter(calendar["filter"], exact_match=args.exact)
+                        for calendar, week_view_df in zip(calendars, calendar_dfs):
                             wb = build_week_view_workbook(week_view_df, week_view_cfg)
                             out_file = os.path.join(output_path, f"{calendar['filename']}.xlsx")
                             _save_workbook_with_fallback(wb, out_file)
@@ -329,25 +352,30 @@ def timetable_exporter():
                 _save_workbook_with_fallback(wb, output_path)
 
         # Process each calendar in the filters
-        calendars = filters_payload.get("calendars")
-
         if not calendars:
             output_file = os.path.join(args.output_dir, "timetable.ics")
-            timetable_data = df.to_dict(orient='records')
-            cal = ical_generator.generate_ical(timetable_data, company)
-            with open(output_file, 'wb') as f:
-                f.write(cal.to_ical())
+            _write_calendar(ical_generator, df, company, output_file)
             return
 
-        for calendar in calendars:
-            output_file = os.path.join(args.output_dir, f"{calendar['filename']}.ics")
-            calendar_filters = calendar["filter"]
-            filtered_df = df.timetable.filter(calendar_filters, exact_match=args.exact)
-            timetable_data = filtered_df.to_dict(orient='records')
-
-            cal = ical_generator.generate_ical(timetable_data, company)
-            with open(output_file, 'wb') as f:
-                f.write(cal.to_ical())
+        jobs = [
+            (filtered_df, os.path.join(args.output_dir, f"{calendar['filename']}.ics"))
+            for calendar, filtered_df in zip(calendars, calendar_dfs)
+        ]
+        workers = min(len(jobs), _available_cpus())
+        # Calendars sharing a filename would have workers writing one file at once; in order, the last one wins
+        distinct_outputs = len({os.path.normcase(os.path.abspath(output_file)) for _, output_file in jobs}) == len(jobs)
+        if workers < 2 or not distinct_outputs:
+            for filtered_df, output_file in jobs:
+                _write_calendar(ical_generator, filtered_df, company, output_file)
+        else:
+            # Calendars are independent and event generation is CPU-bound Python, so use processes
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_write_calendar, ical_generator, filtered_df, company, output_file)
+                    for filtered_df, output_file in jobs
+                ]
+                for future in as_completed(futures):
+                    future.result()
 
     except Exception as e:
         debug_enabled = bool(os.getenv("TIMETABLE_EXPORTER_DEBUG"))
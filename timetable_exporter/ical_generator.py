@@ -1,11 +1,40 @@
 from datetime import datetime, timedelta
+from typing import BinaryIO, Iterator
 from icalendar import Calendar, Event
+import os
 import uuid
 import logging
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
 
+def _to_duration(value):
+    if isinstance(value, str):
+        try:
+            td = pd.to_timedelta(value)
+            return timedelta(seconds=int(td.total_seconds()))
+        except Exception:
+            parts = value.strip().split(":")
+            if len(parts) == 2:
+                hours, minutes = parts
+                seconds = "0"
+            elif len(parts) == 3:
+                hours, minutes, seconds = parts
+            else:
+                raise ValueError(f"Unsupported duration format: {value}")
+            return timedelta(hours=int(hours), minutes=int(minutes), seconds=int(seconds))
+    if isinstance(value, (int, float)):
+        if pd.isna(value):
+            return None
+        return timedelta(hours=value)
+    return value
+
+logger = logging.getLogger(__name__)
+
+# Kinds of configured fields, resolved once per generator
+_DATETIME, _DURATION, _TEXT = 0, 1, 2
+
 class IcalGenerator:
     REQUIRED_FIELDS = ['summary', 'location']
     VALID_FIELDS = ['summary', 'location', 'description', 'dtstart', 'dtend', 'duration', 'category', 'attendee', 'organizer', 'url']
@@ -23,61 +52,112 @@ class IcalGenerator:
             ("dtstart" in self.columns and "duration" in self.columns)):
             raise ValueError("Event time fields need to be configured as: (dtstart & dtend) or (dtstart & duration)")
 
+        # Resolve every configured field to (property name, column, kind) once
+        self._plan = []
+        for key, column in self.columns.items():
+            kind = self._field_kind(key)
+            if kind is None:
+                logger.warning(f"Ignoring unsupported field in config: {key}")
+                continue
+            self._plan.append((key.upper(), column, kind))
 
-    def add_event_property(self, event, key, value, entry):
-
+    def _field_kind(self, key: str) -> int | None:
         if key in ['dtstart', 'dtend']:
-            if value is None or (isinstance(value, float) and pd.isna(value)):
-                return
+            return _DATETIME
+        if key == 'duration':
+            return _DURATION
+        if key in self.VALID_FIELDS:
+            return _TEXT
+        return None
 
-            # Normalize strings to datetime
-            if isinstance(value, str):
-                value = datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
-
-            # Accept pandas Timestamp
-            if isinstance(value, pd.Timestamp):
-                value = value.to_pydatetime()
-
-            # Ensure timezone-aware
-            if isinstance(value, datetime) and value.tzinfo is None:
-                value = value.replace(tzinfo=self.timezone)
-        
-        elif key == 'duration':
-            if isinstance(value, str):
-                try:
-                    td = pd.to_timedelta(value)
-                    value = timedelta(seconds=int(td.total_seconds()))
-                except Exception:
-                    parts = value.strip().split(":")
-                    if len(parts) == 2:
-                        hours, minutes = parts
-                        seconds = "0"
-                    elif len(parts) == 3:
-                        hours, minutes, seconds = parts
-                    else:
-                        raise ValueError(f"Unsupported duration format: {value}")
-                    value = timedelta(hours=int(hours), minutes=int(minutes), seconds=int(seconds))
-            elif isinstance(value, (int, float)):
-                value = timedelta(hours=value)
-        
-        elif key not in self.VALID_FIELDS:
+    def add_event_property(self, event, key, value, entry=None):
+        # Single values go through the same column converters generate_ical uses
+        kind = self._field_kind(key)
+        if kind is None:
             return
+        if kind != _TEXT:
+            value = self._convert(pd.Series([value]), kind)[0]
+            if value is None:
+                return
 
         event.add(key.upper(), value)
 
-    def generate_ical(self, timetable_data: list[dict[str, str]], company: str="TSSAMME") -> Calendar:
+    def _datetime_values(self, series: pd.Series) -> list:
+        if not pd.api.types.is_datetime64_any_dtype(series):
+            series = pd.to_datetime(series, format='%Y-%m-%d %H:%M:%S', cache=True)
+        # Ensure timezone-aware; only the wall time ends up in the file, so ambiguous times can take either offset
+        if series.dt.tz is None:
+            series = series.dt.tz_localize(self.timezone, ambiguous=np.ones(len(series), dtype=bool), nonexistent='shift_forward')
+        missing = series.isna().to_numpy()
+        return [None if m else v for v, m in zip(series.dt.to_pydatetime(), missing)]
+
+    def _duration_values(self, series: pd.Series) -> list:
+        if pd.api.types.is_timedelta64_dtype(series):
+            pass
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            series = pd.to_timedelta(series, unit='h')
+        else:
+            return series.map(_to_duration).tolist()
+        # numpy converts to datetime.timedelta (and NaT to None) at microsecond resolution
+        return series.to_numpy().astype('timedelta64[us]').tolist()
+
+    def _convert(self, series: pd.Series, kind: int) -> list:
+        """Convert a mapped column once into the values added to each event."""
+        if kind == _DATETIME:
+            return self._datetime_values(series)
+        if kind == _DURATION:
+            return self._duration_values(series)
+        return series.tolist()
+
+    def _new_calendar(self, company: str) -> Calendar:
         cal = Calendar()
         cal.add('prodid', '-//'+ company + '//timetable-exporter//EN')
         cal.add('version', '2.0')
+        return cal
+
+    def _events(self, df: pd.DataFrame) -> Iterator[Event]:
+        if not isinstance(df, pd.DataFrame):
+            df = pd.DataFrame(list(df))
+
+        names = [name for name, _, _ in self._plan]
+        kinds = [kind for _, _, kind in self._plan]
+        arrays = [
+            self._convert(df[column], kind) if column in df.columns else [None] * len(df)
+            for _, column, kind in self._plan
+        ]
 
-        for entry in timetable_data:
+        # Draw random bytes for every UID in one call and stamp all events with the same time
+        random_bytes = os.urandom(16 * len(df))
+        dtstamp = datetime.now()
+
+        for i, values in enumerate(zip(*arrays)):
             event = Event()
-            event.add('UID', str(uuid.uuid4()))  # Add a unique identifier for each event
-            event.add('DTSTAMP', datetime.now())
-            for key, column in self.columns.items():
-                value = entry.get(column)
-                self.add_event_property(event, key, value, entry)
+            uid = uuid.UUID(bytes=random_bytes[16 * i:16 * (i + 1)], version=4)
+            event.add('UID', str(uid))  # Add a unique identifier for each event
+            event.add('DTSTAMP', dtstamp)
+            for name, value, kind in zip(names, values, kinds):
+                if value is None and kind != _TEXT:
+                    continue
+                event.add(name, value)
+            yield event
+
+    def iter_events(self, df: pd.DataFrame) -> Iterator[bytes]:
+        """Yield each event serialized as iCalendar bytes, one at a time."""
+        for event in self._events(df):
+            yield event.to_ical()
+
+    def generate_ical(self, df: pd.DataFrame, company: str="TSSAMME") -> Calendar:
+        cal = self._new_calendar(company)
+        for event in self._events(df):
             cal.add_component(event)
-        
         return cal
+
+    def write_ical(self, df: pd.DataFrame, f: BinaryIO, company: str="TSSAMME") -> None:
+        """Stream the calendar to a binary file without building it in memory first."""
+        footer = b'END:VCALENDAR\r\n'
+        header = self._new_calendar(company).to_ical()
+        f.write(header[:-len(footer)])
+        for chunk in self.iter_events(df):
+            f.write(chunk)
+        f.write(footer)
     
\ No newline at end of file
@@ -1,7 +1,7 @@
 import os
 import importlib
 
-from .timetable_accessor import TimetableAccessor
+from .timetable_accessor import TimetableAccessor, timetable_method
 
 for module in os.listdir(os.path.dirname(__file__)):
     if module.endswith('.py') and module != '__init__.py':
@@ -10,12 +10,10 @@ for module in os.listdir(os.path.dirname(__file__)):
         # Import the module
         imported_module = importlib.import_module(module_import_path)
         
-        # Iterate over all attributes in the module
+        # Register only the functions marked with @timetable_method
         for name in dir(imported_module):
-            # Skip special attributes
-            if not name.startswith('__'):
-                # Get the attribute from the module
-                attr = getattr(imported_module, name)
-                
-                # Add the attribute to the TimetableAccessor class
-                setattr(TimetableAccessor, name, attr)
\ No newline at end of file
+            attr = getattr(imported_module, name)
+            if getattr(attr, '_timetable_method', False):
+                # Add the method to the TimetableAccessor class and its registry
+                setattr(TimetableAccessor, name, attr)
+                TimetableAccessor._registry[name] = attr
\ No newline at end of file
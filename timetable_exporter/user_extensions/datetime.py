@@ -1,5 +1,14 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, time
+from functools import lru_cache
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Day, Tick
+
+from .timetable_accessor import timetable_method
 
 
 def _resolve_column_name(df: pd.DataFrame, name: str) -> str:
@@ -17,43 +26,128 @@ def _resolve_column_name(df: pd.DataFrame, name: str) -> str:
             return col
     raise ValueError(f"Column '{name}' does not exist in the DataFrame. Available columns: {list(df.columns)}")
 
-def combine_date_time(self, date_col: str, time_col: str, datetime_col=None, tz=None, drop_invalid: bool = False, keep_source: bool = False) -> pd.DataFrame:
+def _time_of_day(values: pd.Series) -> pd.Series | None:
+    """
+    Return a typed time column as offsets from midnight, or None if it has to go through text parsing.
+    """
+    if pd.api.types.is_timedelta64_dtype(values):
+        return values
+    if pd.api.types.is_datetime64_dtype(values):
+        return values - values.dt.normalize()
+    if values.dtype != object:
+        return None
+    # datetime.time objects (as read from Excel): build each distinct offset once
+    codes, uniques = pd.factorize(values)
+    if not all(isinstance(v, time) and v.tzinfo is None for v in uniques):
+        return None
+    micros = [((v.hour * 60 + v.minute) * 60 + v.second) * 1_000_000 + v.microsecond for v in uniques]
+    # The extra NaT slot is what missing values (code -1) take
+    offsets = np.append(np.array(micros, dtype='timedelta64[us]'), np.timedelta64('NaT', 'us'))
+    return pd.Series(offsets[codes], index=values.index)
+
+def _combine(date: pd.Series, time: pd.Series, fmt=None) -> pd.Series:
+    # Typed dates (e.g. from Excel) are combined with plain datetime64 arithmetic
+    offsets = None
+    if pd.api.types.is_datetime64_dtype(date):
+        offsets = _time_of_day(time)
+    if offsets is not None:
+        return date.dt.normalize() + offsets
+
+    text = date.astype(str) + ' ' + time.astype(str)
+    combined = pd.to_datetime(text, format=fmt or "ISO8601", errors='coerce', cache=True)
+    # Not ISO at all: infer one format for the whole column, as plain pd.to_datetime does.
+    # Rows that merely miss ISO are left invalid rather than parsed with a second guessed format.
+    if fmt is None and combined.isnull().all() and text.notnull().any():
+        combined = pd.to_datetime(text, errors='coerce')
+    return combined
+
+# Recently combined columns, keyed on a hash of their full contents
+_DT_CACHE: OrderedDict = OrderedDict()
+_DT_CACHE_SIZE = 8
+
+def _fingerprint(values: pd.Series) -> tuple:
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    return (str(values.dtype), len(values), hashlib.blake2b(hashes.tobytes(), digest_size=16).digest())
+
+@timetable_method
+def combine_date_time(self, date_col: str, time_col: str, datetime_col=None, tz=None, drop_invalid: bool = False, keep_source: bool = False, fmt=None, cache: bool = False) -> pd.DataFrame:
     """
     Combine date and time columns into a single datetime column.
+
+    `fmt` is the format of the joined "<date> <time>" text. By default ISO 8601
+    is tried first, and the format is only inferred when no value is ISO 8601.
+
+    With `cache=True` the result is kept and reused when the exact same columns
+    are combined again. Fingerprinting the columns costs a full pass over both,
+    so only turn it on when the same data is combined repeatedly in one process.
     """
     if datetime_col is None:
         datetime_col = f"{date_col}_{time_col}"
 
-    df = self._obj.copy()
+    # No defensive copy: only a new column is added, to a shallow copy below
+    df = self._obj
 
     date_col_resolved = _resolve_column_name(df, date_col)
     time_col_resolved = _resolve_column_name(df, time_col)
 
-    # Combine the date and time columns into a single datetime column
-    combined = pd.to_datetime(
-        df[date_col_resolved].astype(str) + ' ' + df[time_col_resolved].astype(str),
-        errors='coerce'
-    )
-    # If a timezone is provided, localize the datetime column to that timezone
-    if tz:
-        combined = combined.dt.tz_localize(tz, ambiguous='NaT', nonexistent='shift_forward')
+    # Reuse the result when the exact same columns were combined recently
+    key = None
+    if cache:
+        key = (_fingerprint(df[date_col_resolved]), _fingerprint(df[time_col_resolved]), fmt, str(tz) if tz else None)
+    cached = _DT_CACHE.get(key) if key is not None else None
+    if cached is not None:
+        _DT_CACHE.move_to_end(key)
+        combined = pd.Series(cached.copy(), index=df.index)
+    else:
+        combined = _combine(df[date_col_resolved], df[time_col_resolved], fmt)
+        # If a timezone is provided, localize the datetime column to that timezone
+        if tz:
+            combined = combined.dt.tz_localize(tz, ambiguous='NaT', nonexistent='shift_forward')
+        if key is not None:
+            _DT_CACHE[key] = combined.array.copy()
+            if len(_DT_CACHE) > _DT_CACHE_SIZE:
+                _DT_CACHE.popitem(last=False)
 
     # Check for any NaT values that may have resulted from invalid date/time combinations
-    if combined.isnull().any():
+    valid = combined.notna().to_numpy()
+    if not valid.all():
         if drop_invalid:
-            df = df.loc[~combined.isnull()].copy()
-            combined = combined.loc[~combined.isnull()]
+            df = df.iloc[valid]
+            combined = combined.iloc[valid]
         else:
             raise ValueError("Invalid date/time combination found in the DataFrame.")
     
-    df[datetime_col] = combined
+    # Assign positionally; both are already aligned row for row
+    df = df.copy(deep=False)
+    df[datetime_col] = combined.array
     # Optionally, drop the original date and time columns
     if not keep_source:
-        df.drop(columns=[date_col_resolved, time_col_resolved], inplace=True)
-    # Update the original DataFrame with the combined datetime column
+        df = df.drop(columns=[date_col_resolved, time_col_resolved])
     
     return df
 
+@lru_cache(maxsize=None)
+def _frequency_step(frequency) -> pd.Timedelta | None:
+    """
+    Fixed-length frequencies ("7D", "14D", ...) as a Timedelta, or None for calendar ones ("MS", "W-MON").
+    """
+    offset = to_offset(frequency)
+    if isinstance(offset, Tick):
+        return pd.Timedelta(offset)
+    if isinstance(offset, Day):
+        return pd.Timedelta(days=offset.n)
+    return None
+
+def _date_range(start: datetime, end: datetime, frequency="7D") -> pd.DatetimeIndex:
+    """
+    Same as pd.date_range(start, end, freq=frequency), using the cheaper periods= form when possible.
+    """
+    step = _frequency_step(frequency)
+    if step is None:
+        return pd.date_range(start=start, end=end, freq=frequency)
+    periods = max(0, (end - start) // step + 1)
+    return pd.date_range(start=start, periods=periods, freq=frequency)
+
 # this function extrapolates date ranges such as [6/3-17/4, 1/5-29/5]
 # to a list of dates [6/3,13/3,20/3,27/3,3/4,10/4,17/4,1/5,8/5,15/5,22/5,29/5]
 def extrapolate_date_range(date_range: str, year: int=None, format=r"%d/%m/%Y", frequency="7D") -> list[datetime]:
@@ -65,8 +159,10 @@ def extrapolate_date_range(date_range: str, year: int=None, format=r"%d/%m/%Y",
     start = append_year(start_str, year=year, format=format)
     end = append_year(end_str, year=year, format=format)
     
+    if start > end:
+        return []
     # Generate and return the list of dates
-    return pd.date_range(start=start, end=end, freq=frequency).tolist()
+    return _date_range(start, end, frequency).tolist()
 
 def extrapolate_date_ranges(date_ranges: str, delim=',', year: int=None, format=r"%d/%m/%Y", frequency="7D") -> list[datetime]:
     if date_ranges is None or (isinstance(date_ranges, float) and pd.isna(date_ranges)):
@@ -91,6 +187,12 @@ def extrapolate_date_ranges(date_ranges: str, delim=',', year: int=None, format=
     return all_dates
 
 
+@lru_cache(maxsize=8192)
+def _parse_cached(date_str: str, format: str) -> datetime:
+    # Timetables repeat a small set of dates, and strptime is slow
+    return datetime.strptime(date_str, format)
+
+
 def append_year(date_str: str, year: int=None, format=r"%d/%m/%y") -> datetime:
     """
     Append a year to a date string.
@@ -102,7 +204,7 @@ def append_year(date_str: str, year: int=None, format=r"%d/%m/%y") -> datetime:
     if not date_str:
         raise ValueError("Empty date string")
     try :
-        date_obj = datetime.strptime(date_str, format)
+        date_obj = _parse_cached(date_str, str(format))
     except ValueError:
         raise ValueError(f"Date string '{date_str}' does not match format '{format}'.")
     if year is not None:
@@ -111,21 +213,84 @@ def append_year(date_str: str, year: int=None, format=r"%d/%m/%y") -> datetime:
     
     
 
+def _parse_date_tokens(tokens: pd.Series, year: int=None, format=r"%d/%m/%Y") -> pd.DatetimeIndex:
+    """
+    Parse a Series of date strings in one vectorized call.
+    """
+    if (tokens == "").any():
+        raise ValueError("Empty date string")
+    try:
+        parsed = pd.DatetimeIndex(pd.to_datetime(tokens, format=format, cache=True))
+    except ValueError:
+        # Re-parse one by one so the error names the offending token
+        for token in tokens.unique():
+            append_year(token, year=year, format=format)
+        raise
+    if year is not None:
+        # Rebuild from components in one call; shifting by whole years would be off by a day around leap years
+        components = {"year": np.full(len(parsed), year), "month": parsed.month, "day": parsed.day}
+        parsed = pd.DatetimeIndex(pd.to_datetime(components)) + (parsed - parsed.normalize())
+    return parsed
+
+
+def _extrapolate_date_column(values: pd.Series, delim=',', year: int=None, format=r"%d/%m/%Y", frequency="7D") -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized equivalent of calling extrapolate_date_ranges on every value of a column.
+
+    Returns flat (row position, date) arrays. Rows without any date keep one NaT entry,
+    like DataFrame.explode does for empty lists.
+    """
+    # Flatten all tokens into one Series indexed by row position
+    raw = pd.Series(values.to_numpy(), index=range(len(values)))
+    tokens = raw.fillna("").astype(str).str.split(delim).explode().str.strip()
+    tokens = tokens[tokens.notna() & (tokens != "")]
+
+    # Single dates are ranges whose start and end are the same
+    is_range = tokens.str.contains("-", regex=False)
+    parts = tokens.str.split("-", n=1)
+    starts = tokens.where(~is_range, parts.str[0]).str.strip()
+    ends = tokens.where(~is_range, parts.str[1]).str.strip()
+
+    start_dates = _parse_date_tokens(starts, year=year, format=format)
+    end_dates = _parse_date_tokens(ends, year=year, format=format)
+
+    # Timetables repeat the same few ranges, so only build each one once
+    pairs = list(zip(start_dates.asi8, end_dates.asi8))
+    ranges = {}
+    for pair, start, end in zip(pairs, start_dates, end_dates):
+        if pair not in ranges:
+            ranges[pair] = _date_range(start, end, frequency).to_numpy()
+
+    dtype = start_dates.to_numpy().dtype
+    lengths = np.fromiter((len(ranges[pair]) for pair in pairs), dtype=np.intp, count=len(pairs))
+    positions = np.repeat(tokens.index.to_numpy(dtype=np.intp), lengths)
+    dates = np.concatenate([ranges[pair] for pair in pairs]) if pairs else np.array([], dtype=dtype)
+
+    # Give rows that produced no dates a single NaT, keeping row order stable
+    empty = np.flatnonzero(np.bincount(positions, minlength=len(values)) == 0)
+    if len(empty):
+        positions = np.concatenate([positions, empty])
+        dates = np.concatenate([dates, np.full(len(empty), np.datetime64("NaT"), dtype=dates.dtype)])
+        order = np.argsort(positions, kind="stable")
+        positions, dates = positions[order], dates[order]
+    return positions, dates
+
+
 # this function turns each row of a Dataframe with a list of dates into a row for each date
+@timetable_method
 def expand_dates(self, dates_col: str , date_col: str=None, year=None, format=r"%d/%m/%Y", frequency="7D") -> pd.DataFrame:
     """
     Expand a DataFrame with a list of dates into separate rows for each date.
     """
     if date_col is None:
         date_col = dates_col
-    df = self._obj.copy()
+    df = self._obj
 
     dates_col_resolved = _resolve_column_name(df, dates_col)
     
-    # extrapolate the date ranges
-    df[date_col] = df[dates_col_resolved].apply(lambda x: extrapolate_date_ranges(x, year=year, format=format, frequency=frequency))
-    # Explode the date column into separate rows
-    # df[date_col] = df[date_col].apply(lambda x: pd.to_datetime(x).strftime(r"%d/%m/%Y"))
-    exploded_df = df.explode(date_col)
+    # extrapolate the date ranges and repeat each row once per date
+    positions, dates = _extrapolate_date_column(df[dates_col_resolved], year=year, format=format, frequency=frequency)
+    exploded_df = df.iloc[positions].copy(deep=False)
+    exploded_df[date_col] = dates
     exploded_df.reset_index(drop=True, inplace=True)
     return exploded_df
\ No newline at end of file
@@ -1,42 +1,84 @@
 import importlib
+import re
+from operator import methodcaller
+
+import numpy as np
 import pandas as pd
 from pandas.api.extensions import register_dataframe_accessor
 
 
-def _resolve_column_name(df: pd.DataFrame, name: str) -> str:
-    if name in df.columns:
-        return name
-
-    if name is None:
-        raise KeyError("Column name is None")
-
-    target = str(name)
-    target_stripped = target.strip()
-
-    # Exact match after stripping
+def _column_lookup(columns: pd.Index) -> tuple[dict, dict]:
+    """Maps from stripped and from stripped, casefolded names to the real column names."""
     stripped_map = {}
-    for col in df.columns:
-        if isinstance(col, str):
-            stripped_map.setdefault(col.strip(), col)
-    if target_stripped in stripped_map:
-        return stripped_map[target_stripped]
-
-    # Case-insensitive match after stripping
     folded_map = {}
-    for col in df.columns:
+    for col in columns:
         if isinstance(col, str):
+            stripped_map.setdefault(col.strip(), col)
             folded_map.setdefault(col.strip().casefold(), col)
-    folded_key = target_stripped.casefold()
-    if folded_key in folded_map:
-        return folded_map[folded_key]
-
-    raise KeyError(f"Column not found: {name}. Available columns: {list(df.columns)}")
+    return stripped_map, folded_map
+
+def _as_text(series: pd.Series) -> pd.Series:
+    """The column as strings for .str matching; string columns are used as they are, without a cast copy."""
+    if pd.api.types.is_string_dtype(series):
+        return series
+    return series.astype(str)
+
+def _column_mask(series: pd.Series, values, exact_match: bool) -> np.ndarray:
+    """Boolean mask of the rows of `series` that match one filter entry."""
+    if isinstance(values, list):
+        if exact_match:
+            mask = series.isin(values)
+        else:
+            # Match any value literally; the alternation is compiled once
+            pattern = re.compile('|'.join(re.escape(str(v)) for v in values), re.IGNORECASE)
+            mask = _as_text(series).str.contains(pattern, na=False)
+    else:
+        if exact_match:
+            mask = series == values
+        else:
+            # Ensure the column is of string type before using .str.contains
+            mask = _as_text(series).str.contains(str(values), case=False, na=False)
+    return mask.to_numpy(dtype=bool, na_value=False)
+
+def timetable_method(func):
+    """Marks a function as a `df.timetable` method that mapping configs can call by name."""
+    func._timetable_method = True
+    return func
 
 @register_dataframe_accessor("timetable")
 class TimetableAccessor:
+    # Methods callable from mapping "user_extensions", by name
+    _registry: dict = {}
+
     def __init__(self, pandas_obj):
         self._obj = pandas_obj
+        # (columns Index, stripped map, folded map) for the last seen columns
+        self._resolver_cache = None
+
+    def _resolve_column_name(self, name: str) -> str:
+        columns = self._obj.columns
+        if name in columns:
+            return name
+
+        if name is None:
+            raise KeyError("Column name is None")
+
+        # The accessor outlives in-place column changes, so rebuild when the Index is replaced
+        if self._resolver_cache is None or self._resolver_cache[0] is not columns:
+            self._resolver_cache = (columns, *_column_lookup(columns))
+        _, stripped_map, folded_map = self._resolver_cache
+
+        target_stripped = str(name).strip()
+        # Exact match after stripping, then case-insensitive match after stripping
+        if target_stripped in stripped_map:
+            return stripped_map[target_stripped]
+        folded_key = target_stripped.casefold()
+        if folded_key in folded_map:
+            return folded_map[folded_key]
 
+        raise KeyError(f"Column not found: {name}. Available columns: {list(columns)}")
+
+    @timetable_method
     def filter(self, filters, exact_match=False):
         """
         Filters the DataFrame based on the provided filters.
@@ -45,33 +87,59 @@ class TimetableAccessor:
         :param exact_match: If True, filters for exact matches. If False, uses string contains.
         :return: A filtered DataFrame.
         """
-        df = self._obj.copy()
+        df = self._obj
         # Apply custom filters to the DataFrame if any
         if filters is None:
             return df
         
+        # Combine every filter into one mask and slice the frame once
+        mask = np.ones(len(df), dtype=bool)
         try:
             for column, values in filters.items():
-                resolved_column = _resolve_column_name(df, column)
-                if isinstance(values, list):
-                    if exact_match:
-                        df = df[df[resolved_column].isin(values)]
-                    else:
-                        # Ensure the column is of string type before using .str.contains
-                        df = df[df[resolved_column].astype(str).str.contains('|'.join(values), case=False, na=False)]
-                else:
-                    if exact_match:
-                        df = df[df[resolved_column] == values]
-                    else:
-                        # Ensure the column is of string type before using .str.contains
-                        df = df[df[resolved_column].astype(str).str.contains(values, case=False, na=False)]
+                resolved_column = self._resolve_column_name(column)
+                mask &= _column_mask(df[resolved_column], values, exact_match)
 
         except KeyError as e:
             raise KeyError(f"Column not found in DataFrame: {e}")
         except Exception as e:
             raise Exception(f"Error applying filters: {e}")
-        return df
+        return df.loc[mask]
+
+    def filter_many(self, filters_list, exact_match=False):
+        """
+        Applies several independent filters to the same DataFrame.
+
+        Equivalent to `[self.filter(f, exact_match) for f in filters_list]`, but each filtered
+        column is factorized once and every filter is only matched against its unique values.
+        :param filters_list: A list of filter dictionaries, as accepted by `filter()`.
+        :param exact_match: If True, filters for exact matches. If False, uses string contains.
+        :return: A list of filtered DataFrames, one per filter dictionary.
+        """
+        df = self._obj
+        factorized = {}
+        results = []
+        try:
+            for filters in filters_list:
+                mask = np.ones(len(df), dtype=bool)
+                for column, values in (filters or {}).items():
+                    resolved_column = self._resolve_column_name(column)
+                    if resolved_column not in factorized:
+                        # Substring filters match the text form, and factorizing the raw values would
+                        # merge hash-equal ones such as 1, 1.0 and True that read differently as text
+                        source = df[resolved_column] if exact_match else _as_text(df[resolved_column])
+                        codes, uniques = pd.factorize(source, use_na_sentinel=False)
+                        factorized[resolved_column] = (codes, pd.Series(uniques))
+                    codes, uniques = factorized[resolved_column]
+                    mask &= _column_mask(uniques, values, exact_match)[codes]
+                results.append(df.loc[mask])
 
+        except KeyError as e:
+            raise KeyError(f"Column not found in DataFrame: {e}")
+        except Exception as e:
+            raise Exception(f"Error applying filters: {e}")
+        return results
+
+    @timetable_method
     def exclude(self, filters, exact_match: bool = False):
         """Exclude rows from the DataFrame based on the provided filters.
 
@@ -81,36 +149,26 @@ class TimetableAccessor:
         :param exact_match: If True, uses exact matching; otherwise uses string contains.
         :return: A filtered DataFrame with matching rows removed.
         """
-        df = self._obj.copy()
+        df = self._obj
         if filters is None:
             return df
 
+        # Rows matching any of the filters are dropped in one slice
+        drop = np.zeros(len(df), dtype=bool)
         try:
             for column, values in filters.items():
-                resolved_column = _resolve_column_name(df, column)
-                series = df[resolved_column]
-
-                if isinstance(values, list):
-                    if exact_match:
-                        mask = series.isin(values)
-                    else:
-                        mask = series.astype(str).str.contains('|'.join(values), case=False, na=False)
-                else:
-                    if exact_match:
-                        mask = series == values
-                    else:
-                        mask = series.astype(str).str.contains(str(values), case=False, na=False)
-
-                df = df.loc[~mask].copy()
+                resolved_column = self._resolve_column_name(column)
+                drop |= _column_mask(df[resolved_column], values, exact_match)
 
         except KeyError as e:
             raise KeyError(f"Column not found in DataFrame: {e}")
         except Exception as e:
             raise Exception(f"Error applying exclude filters: {e}")
 
-        return df
+        return df.loc[~drop]
     
     # function for calling an objects internal method on each row of a column
+    @timetable_method
     def call_internal_method(self, method_name: str, column: str, *args, **kwargs):
         """
         Calls an internal method of the DataFrame on each row.
@@ -120,18 +178,22 @@ class TimetableAccessor:
 
         :return: A DataFrame with the results of the method call.
         """ 
-        df = self._obj.copy()
+        df = self._obj
         # Check if the column exists in the DataFrame
-        resolved_column = _resolve_column_name(df, column)
+        resolved_column = self._resolve_column_name(column)
         # Check if the method is callable
 
-        # Check if the method exists for at least one element in the column
-        if not all(hasattr(x, method_name) for x in df[resolved_column].dropna()):
+        # Probe the first non-missing element only; any other row lacking the method fails in the call below
+        sample = next((x for x in df[resolved_column] if not (pd.api.types.is_scalar(x) and pd.isna(x))), None)
+        if sample is not None and not hasattr(sample, method_name):
             raise AttributeError(f"Method '{method_name}' not found for elements in column '{resolved_column}'.")
 
-        df[resolved_column] = df[resolved_column].apply(lambda x: getattr(x, method_name)(*args, **kwargs))
-        return df
+        # Only the target column is replaced; the rest of the frame is shared
+        out = df.copy(deep=False)
+        out[resolved_column] = df[resolved_column].map(methodcaller(method_name, *args, **kwargs))
+        return out
     
+    @timetable_method
     def rename_columns(self, mapper, **kwargs):
         """
         Renames the columns of the DataFrame.
@@ -139,5 +201,8 @@ class TimetableAccessor:
         :param kwargs: Additional arguments to pass to the rename method.
         :return: A DataFrame with renamed columns.
         """
-        df = self._obj.copy()
-        return df.rename(columns=mapper, **kwargs)
\ No newline at end of file
+        return self._obj.rename(columns=mapper, **kwargs)
+
+TimetableAccessor._registry.update(
+    (name, attr) for name, attr in vars(TimetableAccessor).items() if getattr(attr, "_timetable_method", False)
+)
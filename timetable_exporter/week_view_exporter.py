@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime, time, timedelta
+from datetime import datetime, time
 from typing import Any
 import re
+import zlib
 
+import numpy as np
 import pandas as pd
 from openpyxl import Workbook
 from openpyxl.utils import get_column_letter
@@ -33,10 +36,21 @@ class WeekViewConfig:
     title: str | None
     include_week_pattern: bool
     footer: dict | None
+    summary_annotation_pattern: re.Pattern | None = None
+    summary_annotation_group: int = 1
 
 
 DEFAULT_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
 
+_WK_RE = re.compile(r"WK[^(]*")
+
+# Shared style objects; openpyxl styles are immutable, so every cell can reference the same one
+_CENTER_WRAP = Alignment(horizontal="center", vertical="center", wrap_text=True)
+_CENTER = Alignment(horizontal="center", vertical="center")
+_LEFT = Alignment(horizontal="left", vertical="center", wrap_text=False)
+_BOLD_FONT = Font(bold=True)
+_TITLE_FONT = Font(bold=True, size=14)
+
 
 def _parse_time(value: Any) -> time | None:
     if value is None or (isinstance(value, float) and pd.isna(value)):
@@ -64,6 +78,23 @@ def _to_minutes(t: time) -> int:
     return t.hour * 60 + t.minute
 
 
+def _time_minutes(value: Any) -> int | None:
+    t = _parse_time(value)
+    return None if t is None else _to_minutes(t)
+
+
+def _duration_minutes(value: Any) -> int:
+    try:
+        return int(pd.to_timedelta(value).total_seconds() / 60)
+    except Exception:
+        return int(float(value) * 60) if value is not None else 0
+
+
+def _slot_indices(offsets: np.ndarray, interval_minutes: int) -> np.ndarray:
+    """Slot index of each minute offset from the grid start, truncated toward zero like int()."""
+    return np.sign(offsets) * (np.abs(offsets) // interval_minutes)
+
+
 def _minutes_to_time(minutes: int) -> time:
     return time(hour=minutes // 60, minute=minutes % 60)
 
@@ -82,6 +113,19 @@ def _load_week_view_config(config: dict) -> WeekViewConfig:
     week_pattern_full_term_label = config.get("week_pattern_full_term_label")
     footer = config.get("footer")
 
+    # Compile the annotation regex once; an invalid pattern disables annotations
+    summary_annotation_pattern = None
+    summary_annotation_group = 1
+    if isinstance(summary_annotation, dict) and summary_annotation.get("regex"):
+        try:
+            summary_annotation_pattern = re.compile(str(summary_annotation["regex"]))
+        except re.error:
+            summary_annotation_pattern = None
+        try:
+            summary_annotation_group = int(summary_annotation.get("group", 1))
+        except Exception:
+            summary_annotation_group = 1
+
     day_col = columns.get("day")
     start_time_col = columns.get("start_time")
     end_time_col = columns.get("end_time")
@@ -121,56 +165,84 @@ def _load_week_view_config(config: dict) -> WeekViewConfig:
         title=title,
         include_week_pattern=include_week_pattern,
         footer=footer,
+        summary_annotation_pattern=summary_annotation_pattern,
+        summary_annotation_group=summary_annotation_group,
     )
 
 
-def _extract_summary_annotation(row: pd.Series, cfg: WeekViewConfig) -> str | None:
+def _summary_annotation_column(cfg: WeekViewConfig) -> str | None:
     ann_cfg = cfg.summary_annotation or {}
     if not isinstance(ann_cfg, dict) or not ann_cfg:
         return None
+    return ann_cfg.get("column") or cfg.description_col
+
 
-    col = ann_cfg.get("column") or cfg.description_col
-    if not col:
+def _extract_summary_annotation(raw: Any, cfg: WeekViewConfig) -> str | None:
+    pattern = cfg.summary_annotation_pattern
+    if pattern is None:
         return None
 
-    raw = row.get(col)
     if raw is None or (isinstance(raw, float) and pd.isna(raw)):
         return None
-    text = str(raw)
-
-    regex = ann_cfg.get("regex")
-    if regex:
-        try:
-            m = re.search(str(regex), text)
-        except re.error:
-            return None
-        if not m:
-            return None
-        group = ann_cfg.get("group", 1)
-        try:
-            value = m.group(int(group))
-        except Exception:
-            value = m.group(1)
-        value = str(value).strip()
-        return value or None
-
-    return None
-
 
-def _apply_cell_styles(cell, fill_color: str | None = None, bold: bool = False, align_center: bool = True):
-    if fill_color:
-        cell.fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
-    if bold:
-        cell.font = Font(bold=True)
-    if align_center:
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-
-def _color_for_key(key: str, palette: list[str]) -> str | None:
+    m = pattern.search(str(raw))
+    if not m:
+        return None
+    try:
+        value = m.group(cfg.summary_annotation_group)
+    except IndexError:
+        value = m.group(1)
+    value = str(value).strip()
+    return value or None
+
+
+def _column_values(df: pd.DataFrame, col: str | None) -> pd.Series:
+    """The column `col` of `df`, or all None when it is not configured or missing."""
+    if col and col in df.columns:
+        return df[col]
+    return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+
+def _map_unique(values: pd.Series, func) -> np.ndarray:
+    """Apply `func` once per distinct value and broadcast the results back to every row."""
+    codes, uniques = pd.factorize(values)
+    # The extra last slot is what missing values (code -1) index into
+    results = np.empty(len(uniques) + 1, dtype=object)
+    results[:-1] = [func(value) for value in uniques]
+    mapped = results[codes]
+    # factorize folds None, NaN and NaT together, so missing values are mapped as they are
+    missing = codes == -1
+    if missing.any():
+        mapped[missing] = [func(value) for value in values.to_numpy(dtype=object)[missing]]
+    return mapped
+
+
+def _apply_cell_styles(cell, fill: PatternFill | None = None, font: Font | None = None, alignment: Alignment | None = None):
+    if fill is not None:
+        cell.fill = fill
+    if font is not None:
+        cell.font = font
+    if alignment is not None:
+        cell.alignment = alignment
+
+
+def _solid_fill(color: str, fills: dict[str, PatternFill]) -> PatternFill:
+    """One shared PatternFill per colour instead of a new style object per cell."""
+    fill = fills.get(color)
+    if fill is None:
+        fill = fills[color] = PatternFill(start_color=color, end_color=color, fill_type="solid")
+    return fill
+
+
+def _color_for_key(key: str, palette: list[str], color_cache: dict[str, str | None]) -> str | None:
     if not key or not palette:
         return None
-    idx = abs(hash(key)) % len(palette)
-    return palette[idx]
+    color = color_cache.get(key)
+    if color is None:
+        # Stable across runs, unlike the per-process salted hash()
+        idx = zlib.crc32(key.encode("utf-8")) % len(palette)
+        color = color_cache[key] = palette[idx]
+    return color
 
 
 def _apply_summary_transform(value: Any, transform: dict | None) -> str:
@@ -206,27 +278,24 @@ def _normalize_week_pattern(value: Any, prefix: str | None, full_term_tokens: li
     if text in full_term_tokens and full_term_label:
         return full_term_label
 
-    wk_index = text.find("WK")
-    if wk_index == -1:
+    # Everything from the first "WK" up to an optional "(" note
+    m = _WK_RE.search(text)
+    if not m:
         return None
-
-    wk_text = text[wk_index:].strip()
-    if "(" in wk_text:
-        wk_text = wk_text.split("(", 1)[0].strip()
-    return wk_text
+    return m.group(0).strip()
 
 
 def render_week_view_worksheet(ws, df: pd.DataFrame, config: dict) -> None:
     cfg = _load_week_view_config(config)
 
-    palette = config.get("formatting", {}).get("palette", [])
-
     formatting = config.get("formatting", {})
+    palette = formatting.get("palette", [])
     header_fill = formatting.get("header_fill", "D9D9D9")
     time_fill = formatting.get("time_fill", "F2F2F2")
     border_style = formatting.get("border", "thin")
     day_column_width = formatting.get("day_column_width", 15)
     time_column_width = formatting.get("time_column_width", 10)
+    row_height = formatting.get("row_height", 22)
 
     thin_side = Side(style=border_style)
     cell_border = Border(left=thin_side, right=thin_side, top=thin_side, bottom=thin_side)
@@ -238,8 +307,8 @@ def render_week_view_worksheet(ws, df: pd.DataFrame, config: dict) -> None:
         ws.cell(row=1, column=1, value=cfg.title)
         ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=col_offset + len(cfg.days) - 1)
         title_cell = ws.cell(row=1, column=1)
-        title_cell.font = Font(bold=True, size=14)
-        title_cell.alignment = Alignment(horizontal="center", vertical="center")
+        title_cell.font = _TITLE_FONT
+        title_cell.alignment = _CENTER
         row_offset = 2
 
     # Column widths
@@ -247,63 +316,81 @@ def render_week_view_worksheet(ws, df: pd.DataFrame, config: dict) -> None:
     for idx in range(len(cfg.days)):
         ws.column_dimensions[get_column_letter(col_offset + idx)].width = day_column_width
 
-    # Day headers
-    for idx, day in enumerate(cfg.days):
-        cell = ws.cell(row=row_offset, column=col_offset + idx, value=day)
-        _apply_cell_styles(cell, fill_color=header_fill, bold=True)
-        cell.border = cell_border
-
     # Time slots
     start_minutes = _to_minutes(cfg.start_time)
     end_minutes = _to_minutes(cfg.end_time)
     slot_count = int((end_minutes - start_minutes) / cfg.interval_minutes)
 
+    fills: dict[str, PatternFill] = {}
+
+    # Day headers and time labels are written and styled in one pass, at the same fixed
+    # coordinates as the grid, so rendering into a sheet that already has content stays aligned
+    header_style = _solid_fill(header_fill, fills)
+    for idx, day in enumerate(cfg.days):
+        cell = ws.cell(row=row_offset, column=col_offset + idx, value=day)
+        _apply_cell_styles(cell, fill=header_style, font=_BOLD_FONT, alignment=_CENTER_WRAP)
+        cell.border = cell_border
+
+    time_style = _solid_fill(time_fill, fills)
     for i in range(slot_count):
         slot_start = start_minutes + i * cfg.interval_minutes
-        label = _minutes_to_time(slot_start).strftime("%H:%M")
-        cell = ws.cell(row=row_offset + 1 + i, column=1, value=label)
-        _apply_cell_styles(cell, fill_color=time_fill, bold=True)
+        cell = ws.cell(row=row_offset + 1 + i, column=1, value=_minutes_to_time(slot_start).strftime("%H:%M"))
+        _apply_cell_styles(cell, fill=time_style, font=_BOLD_FONT, alignment=_CENTER_WRAP)
         cell.border = cell_border
-        ws.row_dimensions[row_offset + 1 + i].height = config.get("formatting", {}).get("row_height", 22)
+        ws.row_dimensions[row_offset + 1 + i].height = row_height
 
     # Apply borders to all day/time cells to avoid empty gaps
-    for i in range(slot_count):
-        for j in range(len(cfg.days)):
-            cell = ws.cell(row=row_offset + 1 + i, column=col_offset + j)
+    for row in ws.iter_rows(min_row=row_offset + 1, max_row=row_offset + slot_count,
+                            min_col=col_offset, max_col=col_offset + len(cfg.days) - 1):
+        for cell in row:
             cell.border = cell_border
 
-    # Aggregate bookings
-    entries: dict[tuple, set[str]] = {}
-    for _, row in df.iterrows():
-        day = _normalize_day(row.get(cfg.day_col))
-        if not day:
-            continue
-        if day not in cfg.days:
-            continue
-
-        start_t = _parse_time(row.get(cfg.start_time_col))
-        if start_t is None:
-            continue
+    # Worksheet column of each day; the first occurrence wins, as list.index() did
+    day_to_col: dict[str, int] = {}
+    for idx, day in enumerate(cfg.days):
+        day_to_col.setdefault(day, col_offset + idx)
 
-        end_t = None
-        if cfg.end_time_col:
-            end_t = _parse_time(row.get(cfg.end_time_col))
-        if end_t is None and cfg.duration_col:
-            duration = row.get(cfg.duration_col)
-            try:
-                minutes = int(pd.to_timedelta(duration).total_seconds() / 60)
-            except Exception:
-                minutes = int(float(duration) * 60) if duration is not None else 0
-            end_t = (datetime.combine(datetime.today(), start_t) + timedelta(minutes=minutes)).time()
-
-        if end_t is None:
+    # Aggregate bookings
+    entries: defaultdict[tuple, set[str]] = defaultdict(set)
+    # Normalize days and parse times to minutes of the day once per distinct value,
+    # then drop rows that can never be placed
+    days = _map_unique(_column_values(df, cfg.day_col), _normalize_day)
+    start_times = _map_unique(_column_values(df, cfg.start_time_col), _time_minutes)
+    keep = pd.Series(days).isin(day_to_col.keys()).to_numpy() & pd.notna(start_times)
+    ann_col = _summary_annotation_column(cfg)
+    end_times = _map_unique(_column_values(df, cfg.end_time_col), _time_minutes)
+    if cfg.duration_col:
+        # Bookings without an end time end after their duration; parse it once per distinct value,
+        # and only for those rows. Wraps past midnight like adding a timedelta to a time of day.
+        from_duration = np.flatnonzero(keep & pd.isna(end_times))
+        if len(from_duration):
+            minutes = _map_unique(_column_values(df, cfg.duration_col).iloc[from_duration], _duration_minutes)
+            end_times[from_duration] = (start_times[from_duration] + minutes) % (24 * 60)
+    summaries = _map_unique(_column_values(df, cfg.summary_col), lambda raw: _apply_summary_transform(raw, cfg.summary_transform))
+    annotations = _map_unique(_column_values(df, ann_col), lambda raw: _extract_summary_annotation(raw, cfg))
+    week_patterns = _map_unique(_column_values(df, cfg.week_pattern_col), lambda raw: _normalize_week_pattern(
+        raw,
+        cfg.week_pattern_prefix,
+        cfg.week_pattern_full_term_tokens,
+        cfg.week_pattern_full_term_label,
+    ))
+
+    # Walk the kept rows as plain object arrays, without going back through pandas
+    bookings = zip(
+        days[keep].tolist(),
+        start_times[keep].tolist(),
+        end_times[keep].tolist(),
+        summaries[keep].tolist(),
+        annotations[keep].tolist(),
+        week_patterns[keep].tolist(),
+    )
+    for day, start_min, end_min, base_summary, annotation, week_pattern in bookings:
+        if end_min is None:
             continue
 
-        base_summary = _apply_summary_transform(row.get(cfg.summary_col, ""), cfg.summary_transform)
         if not base_summary:
             continue
 
-        annotation = _extract_summary_annotation(row, cfg)
         if annotation:
             if cfg.summary_format:
                 summary = str(cfg.summary_format).format(summary=base_summary, annotation=annotation)
@@ -312,37 +399,29 @@ def render_week_view_worksheet(ws, df: pd.DataFrame, config: dict) -> None:
         else:
             summary = base_summary
 
-        week_pattern = None
-        if cfg.week_pattern_col:
-            week_pattern = _normalize_week_pattern(
-                row.get(cfg.week_pattern_col, ""),
-                cfg.week_pattern_prefix,
-                cfg.week_pattern_full_term_tokens,
-                cfg.week_pattern_full_term_label,
-            )
-            if cfg.week_pattern_prefix and week_pattern is None:
-                continue
-        key = (day, start_t, end_t, summary)
-        if key not in entries:
-            entries[key] = set()
+        if cfg.week_pattern_col and cfg.week_pattern_prefix and week_pattern is None:
+            continue
+        key = (day, start_min, end_min, summary)
+        bucket = entries[key]
         if week_pattern:
-            entries[key].add(week_pattern)
+            bucket.add(week_pattern)
 
     # Render aggregated blocks
     occupied: dict[int, set[int]] = {col_offset + idx: set() for idx in range(len(cfg.days))}
-    for (day, start_t, end_t, summary), patterns in entries.items():
-        fill_color = _color_for_key(summary, palette)
-
-        start_min = _to_minutes(start_t)
-        end_min = _to_minutes(end_t)
-        start_index = int((start_min - start_minutes) / cfg.interval_minutes)
-        end_index = int((end_min - start_minutes) / cfg.interval_minutes)
+    color_cache: dict[str, str | None] = {}
+    # Slot indices of every block, computed in one pass over the integer minute offsets
+    start_offsets = np.fromiter((key[1] for key in entries), dtype=np.int64, count=len(entries)) - start_minutes
+    end_offsets = np.fromiter((key[2] for key in entries), dtype=np.int64, count=len(entries)) - start_minutes
+    start_indices = _slot_indices(start_offsets, cfg.interval_minutes).tolist()
+    end_indices = _slot_indices(end_offsets, cfg.interval_minutes).tolist()
+    for ((day, _, _, summary), patterns), start_index, end_index in zip(entries.items(), start_indices, end_indices):
+        fill_color = _color_for_key(summary, palette, color_cache)
 
         if start_index < 0 or end_index <= 0:
             continue
         end_index = max(end_index, start_index + 1)
 
-        day_col_index = col_offset + cfg.days.index(day)
+        day_col_index = day_to_col[day]
         block_start_row = row_offset + 1 + start_index
         block_end_row = row_offset + 1 + min(end_index, slot_count) - 1
 
@@ -389,11 +468,12 @@ def render_week_view_worksheet(ws, df: pd.DataFrame, config: dict) -> None:
                 target_cell.value = (existing + "\n" + display).strip()
         else:
             target_cell.value = display
-        target_cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        target_cell.alignment = _CENTER_WRAP
 
         if fill_color:
+            block_fill = _solid_fill(fill_color, fills)
             for r in range(block_start_row, block_end_row + 1):
-                ws.cell(row=r, column=day_col_index).fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
+                ws.cell(row=r, column=day_col_index).fill = block_fill
 
         # Merge blocks for multi-hour sessions when no conflicts exist
         if block_end_row > block_start_row and not has_conflict:
@@ -421,7 +501,7 @@ def render_week_view_worksheet(ws, df: pd.DataFrame, config: dict) -> None:
             row = footer_start + idx
 
             cell = ws.cell(row=row, column=footer_col, value=display_text)
-            cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=False)
+            cell.alignment = _LEFT
             if footer_end_col > footer_col:
                 ws.merge_cells(start_row=row, start_column=footer_col, end_row=row, end_column=footer_end_col)
 